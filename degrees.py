@@ -11,52 +11,101 @@ Example:
 
 import csv
 import sys
-from collections import deque, defaultdict
+from array import array
+from collections import defaultdict
 
 # Maps names to a set of corresponding person_ids
 names = defaultdict(set)
 
-# Maps person_id -> {"name": str, "birth": str, "movies": set(movie_ids)}
-people = {}
+# People and movies are stored as parallel lists indexed by a dense int
+# assigned in load order; person_index / movie_index map CSV ids to it.
+person_index = {}
+person_ids = []
+person_names = []
+person_births = []
+person_movies = []  # idx -> set of movie idxs
+person_coactors = []  # idx -> list of (movie idx, co-star idx)
+
+movie_index = {}
+movie_ids = []
+movie_titles = []
+movie_years = []
+movie_stars = []  # idx -> set of person idxs
 
-# Maps movie_id -> {"title": str, "year": str, "stars": set(person_ids)}
-movies = {}
 
 def load_data(directory):
     """Load data from CSV files into memory."""
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
+        reader = csv.reader(f)
+        header = next(reader)
+        id_i = header.index("id")
+        name_i = header.index("name")
+        birth_i = header.index("birth") if "birth" in header else None
         for row in reader:
-            person_id = row["id"]
-            people[person_id] = {
-                "name": row["name"],
-                "birth": row.get("birth", ""),
-                "movies": set()
-            }
-            names[row["name"].lower()].add(person_id)
+            # IDs are repeated across every table; intern so each is stored once
+            person_id = sys.intern(row[id_i])
+            name = row[name_i]
+            birth = row[birth_i] if birth_i is not None else ""
+            idx = person_index.get(person_id)
+            if idx is None:
+                person_index[person_id] = len(person_ids)
+                person_ids.append(person_id)
+                person_names.append(name)
+                person_births.append(birth)
+                person_movies.append(set())
+                person_coactors.append([])
+            else:
+                person_names[idx] = name
+                person_births[idx] = birth
+            names[name.lower()].add(person_id)
 
     # Load movies
     with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
+        reader = csv.reader(f)
+        header = next(reader)
+        id_i = header.index("id")
+        title_i = header.index("title")
+        year_i = header.index("year") if "year" in header else None
         for row in reader:
-            movie_id = row["id"]
-            movies[movie_id] = {
-                "title": row["title"],
-                "year": row.get("year", ""),
-                "stars": set()
-            }
+            movie_id = sys.intern(row[id_i])
+            title = row[title_i]
+            year = row[year_i] if year_i is not None else ""
+            idx = movie_index.get(movie_id)
+            if idx is None:
+                movie_index[movie_id] = len(movie_ids)
+                movie_ids.append(movie_id)
+                movie_titles.append(title)
+                movie_years.append(year)
+                movie_stars.append(set())
+            else:
+                movie_titles[idx] = title
+                movie_years[idx] = year
 
     # Load stars
     with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
+        reader = csv.reader(f)
+        header = next(reader)
+        movie_i = header.index("movie_id")
+        person_i = header.index("person_id")
         for row in reader:
-            movie_id = row["movie_id"]
-            person_id = row["person_id"]
-            if person_id in people:
-                people[person_id]["movies"].add(movie_id)
-            if movie_id in movies:
-                movies[movie_id]["stars"].add(person_id)
+            movie_idx = movie_index.get(row[movie_i])
+            person_idx = person_index.get(row[person_i])
+            if movie_idx is None or person_idx is None:
+                continue
+            person_movies[person_idx].add(movie_idx)
+            movie_stars[movie_idx].add(person_idx)
+
+    # Flatten person -> movie -> star into one edge list per person for the BFS.
+    # The lists are rebuilt from scratch so reloading doesn't duplicate edges.
+    for coactors in person_coactors:
+        coactors.clear()
+    for movie_idx, stars in enumerate(movie_stars):
+        for a in stars:
+            coactors = person_coactors[a]
+            for b in stars:
+                if a != b:
+                    coactors.append((movie_idx, b))
 
 
 def person_id_for_name(name):
@@ -65,22 +114,23 @@ def person_id_for_name(name):
     If multiple people have the same name, prompt the user to pick.
     Returns person_id (string) or None if not found.
     """
-    person_ids = list(names.get(name.lower(), set()))
-    if not person_ids:
+    matches = names.get(name.lower())
+    if not matches:
         return None
-    if len(person_ids) == 1:
-        return person_ids[0]
+    if len(matches) == 1:
+        return next(iter(matches))
+    candidates = list(matches)
 
     # Ambiguous — ask user to choose
     print(f"Which '{name}'?")
-    for pid in person_ids:
-        person = people[pid]
-        print(f"ID: {pid}, Name: {person['name']}, Birth: {person['birth']}")
+    for pid in candidates:
+        idx = person_index[pid]
+        print(f"ID: {pid}, Name: {person_names[idx]}, Birth: {person_births[idx]}")
     try:
         chosen = input("Enter the ID for the intended person: ").strip()
     except EOFError:
         return None
-    if chosen in person_ids:
+    if chosen in candidates:
         return chosen
     return None
 
@@ -88,7 +138,7 @@ def person_id_for_name(name):
 def shortest_path(source_id, target_id):
     """
     Return the shortest list of (movie_id, person_id) pairs
-    that connect source_id to target_id (BFS).
+    that connect source_id to target_id (bidirectional BFS).
     If no connection, return None.
     Each step describes an edge: source_person --movie--> next_person
     """
@@ -97,32 +147,63 @@ def shortest_path(source_id, target_id):
     if source_id == target_id:
         return []
 
-    # BFS structures
-    frontier = deque()
-    frontier.append(source_id)
-    # parent maps person_id -> (parent_person_id, movie_id)
-    parent = {source_id: None}
-    visited = {source_id}
-
-    while frontier:
-        current = frontier.popleft()
-        for movie_id in people[current]["movies"]:
-            for neighbor in movies[movie_id]["stars"]:
-                if neighbor in visited:
+    source = person_index[source_id]
+    target = person_index[target_id]
+
+    # BFS structures, over person idxs. side marks which search reached a
+    # person (1 from source, 2 from target); parent_person / parent_movie
+    # hold the edge that search reached it by.
+    num_people = len(person_ids)
+    side = bytearray(num_people)
+    parent_person = array("i", [-1]) * num_people
+    parent_movie = array("i", [-1]) * num_people
+    side[source] = 1
+    side[target] = 2
+    front_src = [source]
+    front_tgt = [target]
+
+    def join(u, movie, v):
+        """Path through the edge u --movie--> v, u reached from source, v from target."""
+        path = []
+        cur = u
+        while cur != source:
+            path.append((movie_ids[parent_movie[cur]], person_ids[cur]))
+            cur = parent_person[cur]
+        path.reverse()
+        path.append((movie_ids[movie], person_ids[v]))
+        cur = v
+        while cur != target:
+            nxt = parent_person[cur]
+            path.append((movie_ids[parent_movie[cur]], person_ids[nxt]))
+            cur = nxt
+        return path
+
+    while front_src and front_tgt:
+        # Expand the smaller frontier by one full level. Levels are complete
+        # on both sides, so the first edge between the two searches lies on
+        # a shortest path.
+        if len(front_src) <= len(front_tgt):
+            frontier, mark = front_src, 1
+        else:
+            frontier, mark = front_tgt, 2
+        next_frontier = []
+        for current in frontier:
+            for movie, neighbor in person_coactors[current]:
+                seen = side[neighbor]
+                if seen == mark:
                     continue
-                visited.add(neighbor)
-                parent[neighbor] = (current, movie_id)
-                if neighbor == target_id:
-                    # Reconstruct path from source -> target as list of (movie_id, person_id)
-                    path = []
-                    cur = neighbor
-                    while parent[cur] is not None:
-                        par_person, par_movie = parent[cur]
-                        path.append((par_movie, cur))  # edge: par_person --par_movie--> cur
-                        cur = par_person
-                    path.reverse()
-                    return path
-                frontier.append(neighbor)
+                if seen:
+                    if mark == 1:
+                        return join(current, movie, neighbor)
+                    return join(neighbor, movie, current)
+                side[neighbor] = mark
+                parent_person[neighbor] = current
+                parent_movie[neighbor] = movie
+                next_frontier.append(neighbor)
+        if mark == 1:
+            front_src = next_frontier
+        else:
+            front_tgt = next_frontier
     return None
 
 
@@ -166,9 +247,9 @@ def main():
     # Print each step: i: NameA and NameB starred in MovieTitle
     current_person = source
     for i, (movie_id, person_id) in enumerate(path, start=1):
-        person_a = people[current_person]["name"]
-        person_b = people[person_id]["name"]
-        movie_title = movies[movie_id]["title"]
+        person_a = person_names[person_index[current_person]]
+        person_b = person_names[person_index[person_id]]
+        movie_title = movie_titles[movie_index[movie_id]]
         print(f"{i}: {person_a} and {person_b} starred in {movie_title}")
         current_person = person_id
 
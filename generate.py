@@ -1,6 +1,8 @@
-import copy
+import heapq
+import itertools
 import random
 import sys
+from collections import defaultdict, deque
 
 from crossword import *
 
@@ -15,11 +17,73 @@ class CrosswordCreator:
         Create generator for given Crossword object.
         """
         self.crossword = crossword
-        # Domains: each variable -> set of possible words
+        # Domains: each variable -> set of possible words. All variables start
+        # out sharing one frozenset; a variable gets its own mutable set the
+        # first time its domain is changed (see _mutable_domain).
+        words = frozenset(self.crossword.words)
         self.domains = {
-            var: set(self.crossword.words)
+            var: words
             for var in self.crossword.variables
         }
+        # Word list bucketed by length, for node consistency
+        by_length = defaultdict(set)
+        for word in words:
+            by_length[len(word)].add(word)
+        self._by_length = {
+            length: frozenset(bucket)
+            for length, bucket in by_length.items()
+        }
+        # Cache neighbor and overlap lookups, which the search hits in its hot loops
+        self._neighbors = {
+            var: tuple(self.crossword.neighbors(var))
+            for var in self.crossword.variables
+        }
+        self._overlap = dict(self.crossword.overlaps)
+        # Support index: var -> position -> letter -> words in domain[var]
+        # with that letter at that position
+        self._index = {}
+        # Trail of (var, removed words) logs, one per tentative assignment,
+        # so failed branches can be rolled back without copying domains
+        self._trail = []
+        # Words used by the current partial assignment, kept by backtrack
+        self._used_values = set()
+        # Arc (x, y) -> (x's letters at the overlap, y's letters at the overlap);
+        # both are live views into the support index
+        self._supports = {}
+        # MRV heap of (domain size, -degree, tiebreak, var) entries. Each var
+        # has at most one live entry, kept in _mrv_entry; when its domain
+        # changes size a fresh one replaces it, and entries that are no longer
+        # live are skipped when popped.
+        self._tiebreak = itertools.count()
+        self._rebuild_mrv()
+
+    def _rebuild_mrv(self):
+        """
+        Rebuild the MRV heap with one live entry per variable.
+        """
+        self._mrv_entry = {
+            var: (len(self.domains[var]), -len(self._neighbors[var]), next(self._tiebreak), var)
+            for var in self.crossword.variables
+        }
+        self._mrv = list(self._mrv_entry.values())
+        heapq.heapify(self._mrv)
+
+    def _push_mrv(self, var):
+        """
+        Record var's current domain size in the MRV heap, unless its live
+        entry already has that size.
+        """
+        size = len(self.domains[var])
+        entry = self._mrv_entry.get(var)
+        if entry is not None and entry[0] == size:
+            return
+        entry = (size, -len(self._neighbors[var]), next(self._tiebreak), var)
+        self._mrv_entry[var] = entry
+        heapq.heappush(self._mrv, entry)
+        # Dead entries are only dropped when they reach the top; once they
+        # outnumber the live ones a few times over, start afresh
+        if len(self._mrv) > 4 * len(self._mrv_entry) + 16:
+            self._rebuild_mrv()
 
     def enforce_node_consistency(self):
         """
@@ -27,7 +91,65 @@ class CrosswordCreator:
         word length must equal variable.length.
         """
         for var in list(self.domains.keys()):
-            self.domains[var] = {w for w in self.domains[var] if len(w) == var.length}
+            self.domains[var] = self._by_length.get(var.length, frozenset())
+            self._push_mrv(var)
+        self._index_domains()
+
+    def _index_domains(self):
+        """
+        Rebuild the support index of every variable from its current domain.
+        """
+        self._index = {}
+        for var, words in self.domains.items():
+            index = [defaultdict(set) for _ in range(var.length)]
+            for word in words:
+                for pos, ch in enumerate(word):
+                    index[pos][ch].add(word)
+            self._index[var] = index
+
+        self._supports = {}
+        for (x, y), overlap in self._overlap.items():
+            if overlap is not None:
+                i, j = overlap
+                self._supports[x, y] = (self._index[x][i], self._index[y][j])
+
+    def _mutable_domain(self, var):
+        """
+        Return domain[var] as a set of its own, copying a shared frozenset.
+        """
+        domain = self.domains[var]
+        if not isinstance(domain, set):
+            domain = self.domains[var] = set(domain)
+        return domain
+
+    def _remove_words(self, var, words):
+        """
+        Remove `words` from domain[var], keeping the support index in sync.
+        """
+        self._mutable_domain(var).difference_update(words)
+        index = self._index[var]
+        for word in words:
+            for pos, ch in enumerate(word):
+                bucket = index[pos][ch]
+                bucket.discard(word)
+                if not bucket:
+                    del index[pos][ch]
+        self._push_mrv(var)
+        if self._trail:
+            self._trail[-1].append((var, words))
+
+    def _undo(self, log):
+        """
+        Put back every word removed in `log`, most recent removal first.
+        """
+        for var, words in reversed(log):
+            self._mutable_domain(var).update(words)
+            index = self._index[var]
+            for word in words:
+                for pos, ch in enumerate(word):
+                    index[pos][ch].add(word)
+        for var in {var for var, _ in log}:
+            self._push_mrv(var)
 
     def revise(self, x, y):
         """
@@ -36,24 +158,19 @@ class CrosswordCreator:
         compatible value in domain[y] according to overlap.
         Return True if we removed a value.
         """
-        overlap = self.crossword.overlaps[x, y]
-        if overlap is None:
+        supports = self._supports.get((x, y))
+        if supports is None:
             return False
 
-        i, j = overlap
+        # vx is supported iff some word in domain[y] has vx[i] at position j,
+        # so drop whole letter buckets of x at once rather than word by word
+        index_x, index_y = supports
         to_remove = set()
-        for vx in set(self.domains[x]):
-            # Check if exists vy in domain[y] matching overlap
-            found = False
-            for vy in self.domains[y]:
-                if vx[i] == vy[j]:
-                    found = True
-                    break
-            if not found:
-                to_remove.add(vx)
+        for ch in index_x.keys() - index_y.keys():
+            to_remove |= index_x[ch]
 
         if to_remove:
-            self.domains[x] -= to_remove
+            self._remove_words(x, to_remove)
             return True
         return False
 
@@ -63,18 +180,26 @@ class CrosswordCreator:
         where y is neighbor of x. Return False if some domain becomes empty.
         """
         if arcs is None:
-            queue = [(x, y) for x in self.crossword.variables for y in self.crossword.neighbors(x)]
-        else:
-            queue = list(arcs)
+            arcs = [(x, y) for x in self.crossword.variables for y in self._neighbors[x]]
+
+        # Each arc sits in the queue at most once
+        queue = deque()
+        in_queue = set()
+        for arc in arcs:
+            if arc not in in_queue:
+                queue.append(arc)
+                in_queue.add(arc)
 
         while queue:
-            x, y = queue.pop(0)
+            x, y = queue.popleft()
+            in_queue.discard((x, y))
             if self.revise(x, y):
                 if len(self.domains[x]) == 0:
                     return False
-                for z in self.crossword.neighbors(x):
-                    if z != y:
+                for z in self._neighbors[x]:
+                    if z != y and (z, x) not in in_queue:
                         queue.append((z, x))
+                        in_queue.add((z, x))
         return True
 
     def assignment_complete(self, assignment):
@@ -83,55 +208,59 @@ class CrosswordCreator:
         """
         return set(assignment.keys()) == set(self.crossword.variables)
 
-    def consistent(self, assignment):
+    def consistent(self, assignment, var, value):
         """
-        Return True if assignment satisfies:
-         - All assigned words have correct length
-         - All assigned words are unique (no duplicates)
-         - All overlaps between assigned variables match characters
+        Return True if adding var = value to a consistent assignment keeps it consistent:
+         - value has the correct length
+         - value matches the characters of every assigned neighbor at their overlap
+        Only var changes, so only var's constraints need checking. Uniqueness
+        of value is checked by backtrack against self._used_values.
         """
-        # Unique check
-        values = list(assignment.values())
-        if len(values) != len(set(values)):
+        # length check
+        if len(value) != var.length:
             return False
 
-        for var, word in assignment.items():
-            # length check
-            if len(word) != var.length:
-                return False
-            # overlaps
-            for neighbor in self.crossword.neighbors(var):
-                if neighbor in assignment:
-                    overlap = self.crossword.overlaps[var, neighbor]
-                    if overlap is None:
-                        continue
-                    i, j = overlap
-                    if word[i] != assignment[neighbor][j]:
-                        return False
+        # overlaps
+        for neighbor in self._neighbors[var]:
+            if neighbor in assignment:
+                overlap = self._overlap[var, neighbor]
+                if overlap is None:
+                    continue
+                i, j = overlap
+                if value[i] != assignment[neighbor][j]:
+                    return False
         return True
 
     def order_domain_values(self, var, assignment):
         """
-        Return list of values in var's domain, ordered by least-constraining-value (LCV).
+        Yield values in var's domain, ordered by least-constraining-value (LCV).
         For each value, count how many possible values it rules out for neighboring unassigned variables.
-        Sort ascending by that count.
+        Values come off a heap ascending by that count, so only the values
+        backtracking actually tries are ever ordered.
         """
+        # For each unassigned neighbor: overlap position in var, the neighbor's
+        # words bucketed by letter at the overlap, and its domain size
+        constraints = []
+        for neighbor in self._neighbors[var]:
+            if neighbor in assignment:
+                continue
+            overlap = self._overlap[var, neighbor]
+            if overlap is None:
+                continue
+            i, j = overlap
+            constraints.append((i, self._index[neighbor][j], len(self.domains[neighbor])))
+
         def ruled_out_count(value):
             count = 0
-            for neighbor in self.crossword.neighbors(var):
-                if neighbor in assignment:
-                    continue
-                overlap = self.crossword.overlaps[var, neighbor]
-                if overlap is None:
-                    continue
-                i, j = overlap
-                # For each neighbor domain value, if incompatible, it would be ruled out
-                for w in self.domains[neighbor]:
-                    if value[i] != w[j]:
-                        count += 1
+            for i, letters, size in constraints:
+                # Neighbor values without value[i] at the overlap would be ruled out
+                count += size - len(letters.get(value[i], ()))
             return count
 
-        return sorted(self.domains[var], key=ruled_out_count)
+        keyed = [(ruled_out_count(value), value) for value in self.domains[var]]
+        heapq.heapify(keyed)
+        while keyed:
+            yield heapq.heappop(keyed)[1]
 
     def select_unassigned_variable(self, assignment):
         """
@@ -139,16 +268,19 @@ class CrosswordCreator:
         MRV: variable with fewest remaining values in domain.
         Degree: variable with most neighbors.
         """
-        unassigned = [v for v in self.crossword.variables if v not in assignment]
+        heap = self._mrv
+        while heap:
+            entry = heap[0]
+            var = entry[3]
+            if self._mrv_entry.get(var) is entry:
+                if var not in assignment:
+                    return var
+                # Assigned; backtrack re-pushes it on unassign
+                del self._mrv_entry[var]
+            heapq.heappop(heap)
 
         # If none unassigned (shouldn't happen here), return None
-        if not unassigned:
-            return None
-
-        def key_fn(v):
-            return (len(self.domains[v]), -len(self.crossword.neighbors(v)))
-
-        return min(unassigned, key=key_fn)
+        return None
 
     def backtrack(self, assignment):
         """
@@ -160,13 +292,18 @@ class CrosswordCreator:
 
         var = self.select_unassigned_variable(assignment)
         for value in self.order_domain_values(var, assignment):
+            # Words must be unique across the puzzle
+            if value in self._used_values:
+                continue
+
             # Try assignment
-            new_assignment = assignment.copy()
-            new_assignment[var] = value
-            if self.consistent(new_assignment):
-                # Inference: backup domains and temporarily reduce domain
-                saved_domains = copy.deepcopy(self.domains)
-                self.domains[var] = {value}
+            if self.consistent(assignment, var, value):
+                new_assignment = assignment.copy()
+                new_assignment[var] = value
+                self._used_values.add(value)
+                # Inference: log removals so they can be undone, and reduce domain
+                self._trail.append([])
+                self._remove_words(var, self.domains[var] - {value})
 
                 # Propagate constraints with AC3 for extra pruning
                 if self.ac3():
@@ -175,8 +312,11 @@ class CrosswordCreator:
                         return result
 
                 # restore domains if failure
-                self.domains = saved_domains
+                self._undo(self._trail.pop())
+                self._used_values.discard(value)
 
+        # var goes back to unassigned; its heap entry may have been popped
+        self._push_mrv(var)
         return None
 
     def solve(self):
@@ -38,6 +38,49 @@ PROBS = {
 }
 
 
+def inheritance_probability(genes, mother_genes, father_genes):
+    """
+    Return the probability that a child has `genes` copies of the gene given
+    how many copies each parent has. An unknown parent counts as 0 copies:
+    it can only pass the gene on by mutation.
+    """
+
+    def pass_prob(parent_genes):
+        if parent_genes == 2:
+            return 1 - PROBS["mutation"]
+        elif parent_genes == 1:
+            return 0.5
+        else:
+            return PROBS["mutation"]
+
+    p_m = pass_prob(mother_genes)
+    p_f = pass_prob(father_genes)
+    if genes == 2:
+        return p_m * p_f
+    elif genes == 1:
+        return p_m * (1 - p_f) + (1 - p_m) * p_f
+    else:
+        return (1 - p_m) * (1 - p_f)
+
+
+# Per-person factors only depend on a handful of small ints, so tabulate them
+# once: INHERITANCE[genes, mother_genes, father_genes],
+# CHILD_FACTOR[genes, has_trait, mother_genes, father_genes] and
+# ROOT_FACTOR[genes, has_trait] for people with no parents.
+INHERITANCE = {
+    (genes, m, f): inheritance_probability(genes, m, f)
+    for genes in (0, 1, 2) for m in (0, 1, 2) for f in (0, 1, 2)
+}
+CHILD_FACTOR = {
+    (genes, has_trait, m, f): INHERITANCE[genes, m, f] * PROBS["trait"][genes][has_trait]
+    for genes in (0, 1, 2) for has_trait in (True, False) for m in (0, 1, 2) for f in (0, 1, 2)
+}
+ROOT_FACTOR = {
+    (genes, has_trait): PROBS["gene"][genes] * PROBS["trait"][genes][has_trait]
+    for genes in (0, 1, 2) for has_trait in (True, False)
+}
+
+
 def load_data(filename):
     """
     Load gene information from a file into a dictionary.
@@ -84,14 +127,12 @@ def load_data(filename):
 
 def powerset(s):
     """
-    Return list of all subsets of set s (as sets).
+    Yield all subsets of set s (as sets), smallest first.
     """
     s = list(s)
-    result = []
     for r in range(len(s) + 1):
         for combo in itertools.combinations(s, r):
-            result.append(set(combo))
-    return result
+            yield set(combo)
 
 
 def joint_probability(people, one_gene, two_genes, have_trait):
@@ -104,6 +145,12 @@ def joint_probability(people, one_gene, two_genes, have_trait):
     have_trait: set of names who exhibit trait
     """
 
+    # Gene count per person, built once so the loop below does one dict
+    # lookup per person and parent instead of two set lookups each
+    gene_of = dict.fromkeys(people, 0)
+    gene_of.update(dict.fromkeys(one_gene, 1))
+    gene_of.update(dict.fromkeys(two_genes, 2))
+
     # Start with probability 1 and multiply in each person's probability
     probability = 1.0
 
@@ -117,50 +164,19 @@ def joint_probability(people, one_gene, two_genes, have_trait):
         if father == "":
             father = None
 
-        # Determine number of genes for this person
-        if person in two_genes:
-            genes = 2
-        elif person in one_gene:
-            genes = 1
-        else:
-            genes = 0
+        # Determine number of genes for this person and each parent
+        genes = gene_of[person]
+        has_trait = person in have_trait
 
-        # If no parental information, use unconditional probability
+        # Multiply this person's tabulated factor into the joint probability
         if mother is None and father is None:
-            gene_prob = PROBS["gene"][genes]
+            probability *= ROOT_FACTOR[genes, has_trait]
         else:
-            # compute probability parent passes gene
-            def pass_prob(parent):
-                # parent may not exist (shouldn't happen here), but defend
-                if parent is None:
-                    return PROBS["mutation"]
-                if parent in two_genes:
-                    # parent has two copies -> passes gene with prob 1 - mutation
-                    return 1 - PROBS["mutation"]
-                elif parent in one_gene:
-                    # parent has one copy -> passes gene with prob 0.5
-                    return 0.5
-                else:
-                    # parent has zero copies -> only passes gene by mutation
-                    return PROBS["mutation"]
-
-            p_m = pass_prob(mother)
-            p_f = pass_prob(father)
-
-            # Now compute probability that child has 'genes' copies
-            if genes == 2:
-                gene_prob = p_m * p_f
-            elif genes == 1:
-                gene_prob = p_m * (1 - p_f) + (1 - p_m) * p_f
-            else:  # genes == 0
-                gene_prob = (1 - p_m) * (1 - p_f)
-
-        # Probability of trait given gene count
-        has_trait = person in have_trait
-        trait_prob = PROBS["trait"][genes][has_trait]
+            probability *= CHILD_FACTOR[genes, has_trait, gene_of.get(mother, 0), gene_of.get(father, 0)]
 
-        # Multiply into joint probability
-        probability *= gene_prob * trait_prob
+        # A zero factor (or an underflowed product) can't be multiplied back up
+        if probability == 0.0:
+            return 0.0
 
     return probability
 
@@ -198,15 +214,126 @@ def normalize(probabilities):
             # Defensive fallback: if zero, skip normalization to avoid division by zero,
             # but this indicates something went wrong upstream.
             raise ValueError(f"Total gene probability for {person} is zero; cannot normalize.")
-        for g in dist["gene"]:
-            dist["gene"][g] = dist["gene"][g] / total_gene
+        # One division per distribution; each entry is scaled by the reciprocal
+        gene = dist["gene"]
+        scale = 1.0 / total_gene
+        for g in gene:
+            gene[g] *= scale
 
         # Normalize trait distribution
         total_trait = sum(dist["trait"].values())
         if total_trait == 0:
             raise ValueError(f"Total trait probability for {person} is zero; cannot normalize.")
-        for t in dist["trait"]:
-            dist["trait"][t] = dist["trait"][t] / total_trait
+        trait = dist["trait"]
+        scale = 1.0 / total_trait
+        for t in trait:
+            trait[t] *= scale
+
+
+def gene_factors(people):
+    """
+    Build one factor per person over the gene counts of that person and
+    their parents: P(genes | parents' genes) * P(known trait | genes).
+
+    A factor is a pair (scope, table): scope is a tuple of names and table
+    maps a tuple of gene counts, one per name in scope, to a probability.
+    A parent missing from `people` passes the gene on by mutation only.
+    """
+
+    factors = []
+    for person, info in people.items():
+        # Root-ness goes by the CSV, as in joint_probability; a named parent
+        # missing from `people` still makes this person a child
+        is_root = not info.get("mother") and not info.get("father")
+        parents = [info.get("mother"), info.get("father")]
+        parents = [parent if parent in people else None for parent in parents]
+        scope = tuple(parent for parent in parents if parent is not None) + (person,)
+        trait = info["trait"]
+
+        table = {}
+        for genes in itertools.product((0, 1, 2), repeat=len(scope)):
+            assigned = dict(zip(scope, genes))
+            child = assigned[person]
+
+            if is_root:
+                gene_prob = PROBS["gene"][child]
+            else:
+                gene_prob = INHERITANCE[
+                    child,
+                    0 if parents[0] is None else assigned[parents[0]],
+                    0 if parents[1] is None else assigned[parents[1]],
+                ]
+
+            # Unknown traits sum to 1 over both values, so only evidence counts
+            trait_prob = 1.0 if trait is None else PROBS["trait"][child][trait]
+            table[genes] = gene_prob * trait_prob
+        factors.append((scope, table))
+    return factors
+
+
+def multiply(factors):
+    """
+    Return the product of `factors` as a single factor over the union of their scopes.
+    """
+
+    scope = []
+    for factor_scope, _ in factors:
+        for name in factor_scope:
+            if name not in scope:
+                scope.append(name)
+    scope = tuple(scope)
+
+    # Resolve each factor's names to positions in the joint scope once, so
+    # the per-row work is plain tuple indexing
+    lookups = [
+        (tuple(scope.index(name) for name in factor_scope), factor_table)
+        for factor_scope, factor_table in factors
+    ]
+
+    table = {}
+    for genes in itertools.product((0, 1, 2), repeat=len(scope)):
+        p = 1.0
+        for positions, factor_table in lookups:
+            p *= factor_table[tuple(map(genes.__getitem__, positions))]
+        table[genes] = p
+    return scope, table
+
+
+def sum_out(factor, name):
+    """
+    Return `factor` with `name` summed out of its scope.
+    """
+
+    scope, table = factor
+    k = scope.index(name)
+    summed = dict()
+    for genes, p in table.items():
+        rest = genes[:k] + genes[k + 1:]
+        summed[rest] = summed.get(rest, 0.0) + p
+    return scope[:k] + scope[k + 1:], summed
+
+
+def gene_marginal(factors, person):
+    """
+    Return the unnormalized distribution of `person`'s gene count given the
+    evidence, by variable elimination of everyone else.
+    """
+
+    factors = list(factors)
+    others = {name for scope, _ in factors for name in scope} - {person}
+    while others:
+        # Eliminate whoever yields the smallest intermediate factor
+        def width(name):
+            return len({n for scope, _ in factors if name in scope for n in scope})
+        name = min(others, key=width)
+        others.remove(name)
+
+        related = [factor for factor in factors if name in factor[0]]
+        factors = [factor for factor in factors if name not in factor[0]]
+        factors.append(sum_out(multiply(related), name))
+
+    _, table = multiply(factors)
+    return {genes: table[(genes,)] for genes in (0, 1, 2)}
 
 
 def main():
@@ -225,29 +352,23 @@ def main():
         for person in people
     }
 
-    names = set(people.keys())
-
-    # Loop over all sets of people who might have the trait
-    for have_trait in powerset(names):
-        # Check against known information: if someone's trait is known but
-        # this set disagrees, skip this set.
-        violates_evidence = False
-        for person in names:
-            if people[person]["trait"] is not None:
-                if people[person]["trait"] != (person in have_trait):
-                    violates_evidence = True
-                    break
-        if violates_evidence:
-            continue
-
-        # Loop over all ways to choose who has one gene
-        for one_gene in powerset(names):
-            # Loop over all ways to choose who has two genes (disjoint from one_gene)
-            for two_genes in powerset(names - one_gene):
-                # Compute joint probability
-                p = joint_probability(people, one_gene, two_genes, have_trait)
-                # Update the probabilities dictionary
-                update(probabilities, one_gene, two_genes, have_trait, p)
+    # Exact marginals by variable elimination over the pedigree, instead of
+    # enumerating every joint gene/trait assignment
+    factors = gene_factors(people)
+    for person in people:
+        gene = gene_marginal(factors, person)
+        probabilities[person]["gene"] = gene
+
+        trait = people[person]["trait"]
+        for has_trait in (True, False):
+            if trait is None:
+                probabilities[person]["trait"][has_trait] = sum(
+                    p * PROBS["trait"][genes][has_trait] for genes, p in gene.items()
+                )
+            else:
+                probabilities[person]["trait"][has_trait] = (
+                    sum(gene.values()) if has_trait == trait else 0.0
+                )
 
     # Normalize
     normalize(probabilities)
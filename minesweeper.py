@@ -1,18 +1,54 @@
-import itertools
 import random
+from collections import defaultdict
+
+def cell_bits(mask):
+    """
+    Yield the index of every set bit in `mask`, lowest first.
+    """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
 
 class Sentence():
     """
     A logical statement about a Minesweeper game
     A sentence consists of a set of board cells,
     and a count of how many of those cells are mines.
+
+    Cells are stored as an int bitmask, bit i * width + j standing for
+    cell (i, j), so subset tests and differences are single int operations.
+    `width` must be the board's width; cells outside it raise ValueError.
     """
 
-    def __init__(self, cells, count):
-        # use a set for cells to allow subset operations and easy removal
-        self.cells = set(cells)
+    def __init__(self, cells, count, width=8):
+        self.width = width
+        self.cells_mask = 0
+        for i, j in cells:
+            if i < 0 or not 0 <= j < width:
+                raise ValueError(f"cell {(i, j)} is outside a board of width {width}")
+            self.cells_mask |= 1 << (i * width + j)
+        self.size = self.cells_mask.bit_count()
         self.count = count
 
+    @classmethod
+    def from_mask(cls, cells_mask, count, width=8):
+        """
+        Build a sentence directly from a cell bitmask.
+        """
+        sentence = cls((), count, width)
+        sentence.cells_mask = cells_mask
+        sentence.size = cells_mask.bit_count()
+        return sentence
+
+    @property
+    def cells(self):
+        """
+        The sentence's cells as a set of (i, j) tuples.
+        """
+        return {divmod(bit, self.width) for bit in cell_bits(self.cells_mask)}
+
     def __repr__(self):
         return f"Sentence({self.cells}, {self.count})"
 
@@ -21,8 +57,8 @@ class Sentence():
         If the number of cells equals the count, all cells are mines.
         Return a set of those cells (or an empty set).
         """
-        if len(self.cells) > 0 and len(self.cells) == self.count:
-            return set(self.cells)
+        if self.size > 0 and self.size == self.count:
+            return self.cells
         return set()
 
     def known_safes(self):
@@ -31,7 +67,7 @@ class Sentence():
         Return a set of those cells (or an empty set).
         """
         if self.count == 0:
-            return set(self.cells)
+            return self.cells
         return set()
 
     def mark_mine(self, cell):
@@ -40,8 +76,10 @@ class Sentence():
         remove the cell from self.cells and decrement count by 1.
         If cell not in sentence, do nothing.
         """
-        if cell in self.cells:
-            self.cells.remove(cell)
+        bit = self._bit(cell)
+        if self.cells_mask & bit:
+            self.cells_mask &= ~bit
+            self.size -= 1
             # since that cell is a mine, reduce the count
             self.count -= 1
 
@@ -51,8 +89,20 @@ class Sentence():
         remove the cell from self.cells. Count remains the same.
         If cell not in sentence, do nothing.
         """
-        if cell in self.cells:
-            self.cells.remove(cell)
+        bit = self._bit(cell)
+        if self.cells_mask & bit:
+            self.cells_mask &= ~bit
+            self.size -= 1
+
+    def _bit(self, cell):
+        """
+        Return the bit for `cell`, or 0 if it lies outside the board's width
+        (such a cell can't be in the sentence).
+        """
+        i, j = cell
+        if i < 0 or not 0 <= j < self.width:
+            return 0
+        return 1 << (i * self.width + j)
 
 
 class MinesweeperAI():
@@ -69,9 +119,29 @@ class MinesweeperAI():
         self.moves_made = set()
         self.mines = set()
         self.safes = set()
+        # the same moves made, known mines and known safes as cell bitmasks (see Sentence)
+        self.moves_mask = 0
+        self.mines_mask = 0
+        self.safes_mask = 0
 
         # knowledge base of Sentences
         self.knowledge = []
+        # sentences added or changed since inference last looked at them
+        self._dirty = set()
+
+        # bitmask of each cell's neighbors, indexed by i * width + j
+        self._neighbors = []
+        for i in range(height):
+            for j in range(width):
+                mask = 0
+                for di in [-1, 0, 1]:
+                    for dj in [-1, 0, 1]:
+                        if di == 0 and dj == 0:
+                            continue
+                        ni, nj = i + di, j + dj
+                        if 0 <= ni < height and 0 <= nj < width:
+                            mask |= 1 << (ni * width + nj)
+                self._neighbors.append(mask)
 
     def mark_mine(self, cell):
         """
@@ -80,9 +150,13 @@ class MinesweeperAI():
         if cell in self.mines:
             return
         self.mines.add(cell)
+        bit = 1 << (cell[0] * self.width + cell[1])
+        self.mines_mask |= bit
         # update all sentences
         for sentence in self.knowledge:
-            sentence.mark_mine(cell)
+            if sentence.cells_mask & bit:
+                sentence.mark_mine(cell)
+                self._dirty.add(sentence)
 
     def mark_safe(self, cell):
         """
@@ -91,8 +165,12 @@ class MinesweeperAI():
         if cell in self.safes:
             return
         self.safes.add(cell)
+        bit = 1 << (cell[0] * self.width + cell[1])
+        self.safes_mask |= bit
         for sentence in self.knowledge:
-            sentence.mark_safe(cell)
+            if sentence.cells_mask & bit:
+                sentence.mark_safe(cell)
+                self._dirty.add(sentence)
 
     def add_knowledge(self, cell, count):
         """
@@ -105,97 +183,107 @@ class MinesweeperAI():
         """
         # 1) mark move made
         self.moves_made.add(cell)
+        self.moves_mask |= 1 << (cell[0] * self.width + cell[1])
 
         # 2) mark as safe
         self.mark_safe(cell)
 
         # 3) construct new sentence from neighbors (excluding known safes / known mines)
         (i, j) = cell
-        neighbors = set()
-        for di in [-1, 0, 1]:
-            for dj in [-1, 0, 1]:
-                if di == 0 and dj == 0:
-                    continue
-                ni, nj = i + di, j + dj
-                if 0 <= ni < self.height and 0 <= nj < self.width:
-                    neighbor = (ni, nj)
-                    # Skip cells we already know are safe or moves made (they're already revealed safe)
-                    if neighbor in self.safes:
-                        continue
-                    # If neighbor is known mine, decrement count (don't include in sentence)
-                    if neighbor in self.mines:
-                        count -= 1
-                        continue
-                    # Otherwise include in sentence if not already a move made
-                    if neighbor not in self.moves_made:
-                        neighbors.add(neighbor)
+        neighbors = self._neighbors[i * self.width + j]
+        # Known mines are left out of the sentence and taken off its count;
+        # known safes (which include every move made) are left out
+        count -= (neighbors & self.mines_mask).bit_count()
+        cells_mask = neighbors & ~self.safes_mask & ~self.mines_mask
 
         # Add the new sentence if it has any cells
-        new_sentence = None
-        if len(neighbors) > 0:
-            new_sentence = Sentence(neighbors, count)
+        if cells_mask:
+            new_sentence = Sentence.from_mask(cells_mask, count, self.width)
             self.knowledge.append(new_sentence)
+            self._dirty.add(new_sentence)
 
-        # 4) Repeatedly update KB: mark safes/mines from sentences and infer new sentences
-        changed = True
-        while changed:
-            changed = False
+        # 4) Repeatedly update KB: mark safes/mines from sentences and infer new
+        # sentences. Only sentences that changed since they were last looked at
+        # can give anything new, so each round works from the dirty ones.
+        while self._dirty:
+            dirty = self._dirty
+            self._dirty = set()
 
-            # Collect safes and mines known from sentences
-            safes_to_mark = set()
-            mines_to_mark = set()
-            for sentence in self.knowledge:
-                safes_to_mark |= sentence.known_safes()
-                mines_to_mark |= sentence.known_mines()
+            # Collect safes and mines known from sentences, as cell bitmasks
+            safes_to_mark = 0
+            mines_to_mark = 0
+            for sentence in dirty:
+                # Same tests as known_safes / known_mines, inlined for the hot loop
+                if not sentence.size:
+                    continue
+                if sentence.count == 0:
+                    safes_to_mark |= sentence.cells_mask
+                elif sentence.count == sentence.size:
+                    mines_to_mark |= sentence.cells_mask
 
             # Mark discovered safes
-            for s in safes_to_mark:
+            for bit in cell_bits(safes_to_mark):
+                s = divmod(bit, self.width)
                 if s not in self.safes:
                     self.mark_safe(s)
-                    changed = True
 
             # Mark discovered mines
-            for m in mines_to_mark:
+            for bit in cell_bits(mines_to_mark):
+                m = divmod(bit, self.width)
                 if m not in self.mines:
                     self.mark_mine(m)
-                    changed = True
 
             # Remove empty sentences
-            self.knowledge = [s for s in self.knowledge if len(s.cells) > 0]
+            self.knowledge = [s for s in self.knowledge if s.size > 0]
 
             # Subset inference: if sentence A's cells are subset of sentence B's cells,
             # we can infer B - A has count difference
-            new_inferred = []
-            for s1, s2 in itertools.permutations(self.knowledge, 2):
-                if s1.cells and s2.cells and s1 != s2 and s1.cells.issubset(s2.cells):
-                    inferred_cells = s2.cells - s1.cells
+            # Bucket sentences by cell: every superset of A contains each of A's
+            # cells, so only sentences sharing A's rarest cell need testing
+            containing = defaultdict(list)
+            for s in self.knowledge:
+                for bit in cell_bits(s.cells_mask):
+                    containing[bit].append(s)
+            # (cells, count) of every known sentence, for O(1) duplicate checks
+            known = {(s.cells_mask, s.count) for s in self.knowledge}
+
+            # Only pairs with a dirty sentence on either side can be new
+            pairs = []
+            for s in dirty:
+                if not s.size:
+                    continue
+                # s as the subset
+                rarest = min(cell_bits(s.cells_mask), key=lambda bit: len(containing[bit]))
+                for s2 in containing[rarest]:
+                    pairs.append((s, s2))
+                # s as the superset: visit each candidate subset once, at its lowest cell
+                for bit in cell_bits(s.cells_mask):
+                    for s1 in containing[bit]:
+                        if s1.cells_mask & -s1.cells_mask == 1 << bit:
+                            pairs.append((s1, s))
+
+            for s1, s2 in pairs:
+                if s2.size > s1.size and (s1.cells_mask & s2.cells_mask) == s1.cells_mask:
+                    inferred_mask = s2.cells_mask & ~s1.cells_mask
                     inferred_count = s2.count - s1.count
-                    # Only add meaningful sentences
-                    if len(inferred_cells) > 0:
-                        inferred = Sentence(inferred_cells, inferred_count)
-                        # avoid duplicates: comparable by cells and count
-                        duplicate = False
-                        for old in self.knowledge + new_inferred:
-                            if old.cells == inferred.cells and old.count == inferred.count:
-                                duplicate = True
-                                break
-                        if not duplicate:
-                            new_inferred.append(inferred)
-
-            if new_inferred:
-                for s in new_inferred:
-                    self.knowledge.append(s)
-                changed = True
+                    # avoid duplicates: comparable by cells and count
+                    key = (inferred_mask, inferred_count)
+                    if key not in known:
+                        known.add(key)
+                        inferred = Sentence.from_mask(inferred_mask, inferred_count, self.width)
+                        self.knowledge.append(inferred)
+                        self._dirty.add(inferred)
 
     def make_safe_move(self):
         """
         Return a known safe cell that has not yet been chosen.
         If no such moves, return None.
         """
-        for safe in self.safes:
-            if safe not in self.moves_made:
-                return safe
-        return None
+        candidates = self.safes_mask & ~self.moves_mask
+        if not candidates:
+            return None
+        bit = (candidates & -candidates).bit_length() - 1
+        return divmod(bit, self.width)
 
     def make_random_move(self):
         """
@@ -203,15 +291,13 @@ class MinesweeperAI():
         not known to be mines and have not already been chosen.
         If no moves are possible, return None.
         """
-        all_cells = [
-            (i, j)
-            for i in range(self.height)
-            for j in range(self.width)
-        ]
-        choices = [
-            cell for cell in all_cells
-            if cell not in self.moves_made and cell not in self.mines
-        ]
-        if not choices:
+        board = (1 << (self.height * self.width)) - 1
+        choices = board & ~self.moves_mask & ~self.mines_mask
+        n = choices.bit_count()
+        if not n:
             return None
-        return random.choice(choices)
+        # Drop the k lowest candidates, then take the lowest one left
+        for _ in range(random.randrange(n)):
+            choices &= choices - 1
+        bit = (choices & -choices).bit_length() - 1
+        return divmod(bit, self.width)
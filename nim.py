@@ -1,4 +1,6 @@
+import functools
 import random
+from concurrent.futures import ProcessPoolExecutor
 
 class Nim:
     """
@@ -6,17 +8,23 @@ class Nim:
     """
 
     def __init__(self, piles):
-        self.piles = piles.copy()
+        # Piles are an immutable tuple, so they can be used as a state as is
+        self.piles = tuple(piles)
         self.player = 0
         self.winner = None
 
     @staticmethod
+    @functools.lru_cache(maxsize=None)
     def available_actions(piles):
+        """
+        Return the frozenset of (pile, count) actions available in `piles`.
+        Results are memoized, so `piles` must be a tuple.
+        """
         actions = set()
         for i, pile in enumerate(piles):
             for j in range(1, pile + 1):
                 actions.add((i, j))
-        return actions
+        return frozenset(actions)
 
     @staticmethod
     def other_player(player):
@@ -27,7 +35,10 @@ class Nim:
 
     def move(self, action):
         pile, count = action
-        self.piles[pile] -= count
+        # Resolve the index as list indexing would (negative counts from the
+        # end, out of range raises IndexError) before slicing the tuple
+        pile = range(len(self.piles))[pile]
+        self.piles = self.piles[:pile] + (self.piles[pile] - count,) + self.piles[pile + 1:]
         self.switch_player()
         if all(pile == 0 for pile in self.piles):
             self.winner = self.player
@@ -36,10 +47,18 @@ class Nim:
 class NimAI:
     """
     Q-Learning AI for Nim.
+
+    States passed to its methods must be tuples of pile sizes, so they can be
+    used as dict keys without converting on every call.
     """
 
     def __init__(self, alpha=0.5, epsilon=0.1):
+        # Q-values as state -> action -> value, so a state is hashed once per move
         self.q = dict()
+        # Cached best_future_reward per state, and the action achieving it
+        # (None while the best is the default 0); kept current by update_q_value
+        self.best_q = dict()
+        self.best_action = dict()
         self.alpha = alpha
         self.epsilon = epsilon
 
@@ -48,8 +67,10 @@ class NimAI:
         Return Q-value for (state, action) pair.
         Default to 0 if missing.
         """
-        state = tuple(state)
-        return self.q.get((state, action), 0)
+        values = self.q.get(state)
+        if values is None:
+            return 0
+        return values.get(action, 0)
 
     def update_q_value(self, state, action, old_q, reward, future_rewards):
         """
@@ -59,81 +80,139 @@ class NimAI:
         new_value_estimate = reward + future_rewards
         updated = old_q + self.alpha * (new_value_estimate - old_q)
 
-        state = tuple(state)
-        self.q[(state, action)] = updated
+        values = self.q.setdefault(state, {})
+        first_seen = action not in values
+        values[action] = updated
+
+        # Keep the best-reward cache current: a new maximum replaces it. A
+        # rescan is needed when the best action's value drops, or when the
+        # best is the 0 of unseen actions and one of them just got a value.
+        best = self.best_q.get(state)
+        if best is not None and updated > best:
+            self.best_q[state] = updated
+            self.best_action[state] = action
+        elif (
+            best is None
+            or action == self.best_action[state]
+            or (first_seen and self.best_action[state] is None)
+        ):
+            self._rescan_best(state)
+
+    def _rescan_best(self, state):
+        """
+        Recompute the cached best reward and action for `state` from Q.
+        """
+        values = self.q.get(state, {})
+        best, best_action = 0, None
+        if values:
+            best_action = max(values, key=values.get)
+            best = values[best_action]
+        # Actions missing from Q count as 0, and may beat every known value
+        if best < 0 and len(values) < len(Nim.available_actions(state)):
+            best, best_action = 0, None
+        self.best_q[state] = best
+        self.best_action[state] = best_action
 
     def best_future_reward(self, state):
         """
-        Return max Q-value among all actions in this state.
-        If none exist, return 0.
+        Return max Q-value among all actions in this state, counting actions
+        without a Q-value as 0. If none exist, return 0.
         """
-        state = tuple(state)
-        actions = Nim.available_actions(list(state))
-
-        if not actions:
-            return 0
-
-        max_reward = 0
-        for action in actions:
-            q = self.get_q_value(state, action)
-            if q > max_reward:
-                max_reward = q
-
-        return max_reward
+        return self.best_q.get(state, 0)
 
     def choose_action(self, state, epsilon=True):
         """
         Choose an action using ε-greedy or greedy strategy.
         """
-        actions = list(Nim.available_actions(state))
-
-        if not epsilon:
-            # greedy
-            best = None
-            best_q = float("-inf")
-            for action in actions:
-                q = self.get_q_value(state, action)
-                if q > best_q:
-                    best_q = q
-                    best = action
-            return best
-
-        # ε-greedy
-        if random.random() < self.epsilon:
-            return random.choice(actions)
+        # ε-greedy: explore with probability epsilon
+        if epsilon and random.random() < self.epsilon:
+            return random.choice(list(Nim.available_actions(state)))
 
         # otherwise greedy
-        best = None
-        best_q = float("-inf")
-        for action in actions:
-            q = self.get_q_value(state, action)
-            if q > best_q:
-                best_q = q
-                best = action
+        return self._greedy_action(state)
+
+    def _greedy_action(self, state):
+        """
+        Return an action with the highest Q-value in `state`, or None if there
+        are no actions.
+        """
+        # The cached action, if any, has the highest Q-value in this state
+        cached = self.best_action.get(state)
+        if cached is not None:
+            return cached
 
-        return best
+        # Otherwise the best is the 0 of actions without a Q-value, so the
+        # first action that isn't negative is a best one
+        values = self.q.get(state, {})
+        for action in Nim.available_actions(state):
+            if values.get(action, 0) >= 0:
+                return action
+        return None
 
 
-def train(n):
+def train(n, workers=1):
     """
     Train an AI by playing `n` games of Nim.
+
+    With workers > 1 the games are split across that many processes, each
+    training its own AI from scratch; every Q-value of the result is the
+    average over the workers that learned one for that state and action.
+    """
+    ai = NimAI()
+    if workers <= 1:
+        _train_games(ai, n)
+        return ai
+
+    # Each worker gets its own seed so the processes don't replay the same games
+    games = [n // workers + (i < n % workers) for i in range(workers)]
+    seeds = [random.getrandbits(64) for _ in range(workers)]
+    with ProcessPoolExecutor(workers) as executor:
+        tables = list(executor.map(_train_worker, games, seeds))
+
+    totals = dict()
+    for q in tables:
+        for state, values in q.items():
+            state_totals = totals.setdefault(state, {})
+            for action, value in values.items():
+                total, count = state_totals.get(action, (0, 0))
+                state_totals[action] = (total + value, count + 1)
+    for state, state_totals in totals.items():
+        ai.q[state] = {
+            action: total / count
+            for action, (total, count) in state_totals.items()
+        }
+        ai._rescan_best(state)
+    return ai
+
+
+def _train_worker(n, seed):
     """
+    Train a fresh AI on `n` games with its own random seed; return its Q-values.
+    """
+    random.seed(seed)
     ai = NimAI()
+    _train_games(ai, n)
+    return ai.q
+
 
+def _train_games(ai, n):
+    """
+    Train `ai` in place by playing `n` games of Nim against itself.
+    """
     for _ in range(n):
         game = Nim([1, 3, 5, 7])
         last = {0: {"state": None, "action": None},
                 1: {"state": None, "action": None}}
 
         while True:
-            state = game.piles.copy()
+            state = game.piles
             action = ai.choose_action(state)
 
             last_state = last[game.player]["state"]
             last_action = last[game.player]["action"]
 
             game.move(action)
-            new_state = game.piles.copy()
+            new_state = game.piles
 
             if last_state is not None:
                 reward = 0
@@ -163,8 +242,6 @@ def train(n):
                     )
                 break
 
-    return ai
-
 
 def play(ai):
     """
@@ -173,7 +250,7 @@ def play(ai):
     game = Nim([1, 3, 5, 7])
 
     while True:
-        print("Piles:", game.piles)
+        print("Piles:", list(game.piles))
 
         if game.player == 0:
             pile = int(input("Choose pile: "))
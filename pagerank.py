@@ -1,4 +1,7 @@
+import itertools
+import operator
 import random
+from concurrent.futures import ProcessPoolExecutor
 
 def transition_model(corpus, page, damping_factor):
     """
@@ -28,13 +31,53 @@ def transition_model(corpus, page, damping_factor):
     return distribution
 
 
-def sample_pagerank(corpus, damping_factor, n):
+def sample_pagerank(corpus, damping_factor, n, workers=1):
     """
     Return PageRank values for each page by sampling.
+
+    With workers > 1 the n samples are split into that many independent
+    chains, run in separate processes, and their counts are added up.
+    """
+
+    if workers <= 1:
+        counts = _sample_counts(corpus, damping_factor, n)
+    else:
+        # Each chain gets its own seed so the processes don't walk in lockstep
+        samples = [n // workers + (i < n % workers) for i in range(workers)]
+        seeds = [random.getrandbits(64) for _ in range(workers)]
+        with ProcessPoolExecutor(workers) as executor:
+            chains = list(executor.map(
+                _sample_counts,
+                [corpus] * workers, [damping_factor] * workers, samples, seeds
+            ))
+        counts = {page: sum(chain[page] for chain in chains) for page in corpus}
+
+    # Convert counts into probabilities
+    pageranks = {page: counts[page] / n for page in counts}
+    return pageranks
+
+
+def _sample_counts(corpus, damping_factor, n, seed=None):
     """
+    Walk one chain of `n` samples through the corpus and return how many
+    times each page was visited. A seed, if given, reseeds `random` first.
+    """
+
+    if seed is not None:
+        random.seed(seed)
 
     # Initialize counts for all pages
     counts = {page: 0 for page in corpus}
+    if n <= 0:
+        return counts
+
+    # A page's transition model never changes, so build each one once as a
+    # (population, cumulative weights) pair; random.choices then only has to
+    # bisect the cumulative weights instead of summing them on every draw
+    models = dict()
+    for page in corpus:
+        model = transition_model(corpus, page, damping_factor)
+        models[page] = (tuple(model.keys()), list(itertools.accumulate(model.values())))
 
     # First sample: choose a page at random
     pages = list(corpus.keys())
@@ -43,63 +86,78 @@ def sample_pagerank(corpus, damping_factor, n):
 
     # Remaining samples
     for _ in range(1, n):
-        model = transition_model(corpus, current_page, damping_factor)
+        population, cum_weights = models[current_page]
 
         # Randomly choose next page based on probability distribution
-        next_page = random.choices(
-            population=list(model.keys()),
-            weights=list(model.values()),
-            k=1
-        )[0]
+        next_page = random.choices(population, cum_weights=cum_weights, k=1)[0]
 
         counts[next_page] += 1
         current_page = next_page
 
-    # Convert counts into probabilities
-    pageranks = {page: counts[page] / n for page in counts}
-    return pageranks
+    return counts
 
 
-def iterate_pagerank(corpus, damping_factor):
+def iterate_pagerank(corpus, damping_factor, tol=1e-6, max_iter=100):
     """
     Return PageRank values for each page by iteratively applying the formula.
+
+    Stops once the total (L1) change across all pages in one iteration is
+    below N * tol, or after max_iter iterations.
     """
 
     N = len(corpus)
-    pagerank = {page: 1 / N for page in corpus}
 
-    # Preprocess: treat pages with no links as linking to ALL pages
-    fixed_corpus = dict()
-    for page in corpus:
-        if len(corpus[page]) == 0:
-            fixed_corpus[page] = set(corpus.keys())
-        else:
-            fixed_corpus[page] = corpus[page]
-
-    converged = False
-    while not converged:
-        new_ranks = dict()
-
-        for page in pagerank:
-            # Base probability from random jump
-            rank = (1 - damping_factor) / N
-
-            # Add contributions from all pages that link to this one
-            total = 0
-            for p in pagerank:
-                if page in fixed_corpus[p]:
-                    total += pagerank[p] / len(fixed_corpus[p])
-
-            rank += damping_factor * total
-            new_ranks[page] = rank
-
-        # Check convergence (change <= 0.001)
-        converged = all(
-            abs(new_ranks[p] - pagerank[p]) <= 0.001
-            for p in pagerank
-        )
-
-        pagerank = new_ranks
+    # Pages are numbered 0..N-1 so ranks can live in a plain list
+    pages = list(corpus)
+    index = {page: i for i, page in enumerate(pages)}
+
+    # Transition matrix in CSR form, one row per page: the pages linking to
+    # page i are indices[indptr[i]:indptr[i + 1]]. Every link out of page j
+    # carries the same share of its rank, out_share[j], so the weights are
+    # kept per source page rather than per link.
+    # Pages with no links are treated as linking to ALL pages. Rather than
+    # storing N links for each of them, their combined rank is spread evenly
+    # over every page each iteration.
+    inlinks = [[] for _ in pages]
+    out_share = []
+    dangling = []
+    for j, p in enumerate(pages):
+        links = corpus[p]
+        if len(links) == 0:
+            dangling.append(j)
+            out_share.append(0)
+            continue
+        out_share.append(1 / len(links))
+        for q in links:
+            inlinks[index[q]].append(j)
+    indptr = [0]
+    indices = []
+    for row in inlinks:
+        indices.extend(row)
+        indptr.append(len(indices))
+
+    ranks = [1 / N] * N
+    jump = (1 - damping_factor) / N
+
+    for _ in range(max_iter):
+        # Rank each page passes along every one of its links this iteration
+        shares = list(map(operator.mul, ranks, out_share))
+        # Every page gets the random jump plus an even cut of the dangling rank
+        base = jump + damping_factor * sum(map(ranks.__getitem__, dangling)) / N
+
+        new_ranks = []
+        for i in range(N):
+            # Base plus contributions from all pages that link to this one
+            total = sum(map(shares.__getitem__, indices[indptr[i]:indptr[i + 1]]))
+            new_ranks.append(base + damping_factor * total)
+
+        # Check convergence (L1 change < N * tol)
+        err = sum(abs(new - old) for new, old in zip(new_ranks, ranks))
+        ranks = new_ranks
+        if err < N * tol:
+            break
+
+    pagerank = dict(zip(pages, ranks))
 
     # Normalize so they sum to exactly 1
     total = sum(pagerank.values())
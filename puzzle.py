@@ -1,3 +1,5 @@
+import itertools
+
 from logic import *
 
 # Symbols
@@ -68,13 +70,10 @@ knowledge3 = And(
     Or(CKnight, CKnave),
     Not(And(CKnight, CKnave)),
 
-    # A said one of the two statements (unknown which)
-    Or(
-        # A said "I am a knight"
-        And(AKnight, Implication(AKnight, AKnight), Implication(AKnave, Not(AKnight))),
-        # A said "I am a knave"
-        And(AKnight, Implication(AKnight, AKnave), Implication(AKnave, Not(AKnave)))
-    ),
+    # A said one of the two statements (unknown which). Both cases take A to
+    # be a knight: "I am a knight" then holds trivially, and "I am a knave"
+    # would make A both, so the two cases together reduce to this
+    AKnight,
 
     # B says A said "I am a knave"
     Implication(BKnight, AKnave),
@@ -97,11 +96,30 @@ puzzles = [
     ("Puzzle 3", knowledge3)
 ]
 
+def satisfying_models(knowledge):
+    """
+    Return every model (dict of symbol name -> truth value) over the symbols
+    of `knowledge` in which `knowledge` is true.
+    """
+    symbols = sorted(knowledge.symbols())
+    models = []
+    for values in itertools.product((True, False), repeat=len(symbols)):
+        model = dict(zip(symbols, values))
+        if knowledge.evaluate(model):
+            models.append(model)
+    return models
+
+
 def main():
     for puzzle, knowledge in puzzles:
         print(puzzle)
+        # Enumerate the knowledge's models once and test every symbol against
+        # them, instead of a full model_check per symbol
+        models = satisfying_models(knowledge)
         for symbol in [AKnight, AKnave, BKnight, BKnave, CKnight, CKnave]:
-            if model_check(knowledge, symbol):
+            # Entailed iff true in every model; a symbol the knowledge never
+            # mentions is free, so it is only entailed if there are no models
+            if all(model.get(symbol.name, False) for model in models):
                 print(f"    {symbol}")
 
 
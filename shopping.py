@@ -2,8 +2,11 @@
 import csv
 import sys
 
+import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.neighbors import KNeighborsClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
 
 # Map month abbreviations to integer indices 0..11
 MONTHS = {
@@ -22,15 +25,26 @@ MONTHS = {
     "Dec": 11
 }
 
+# Evidence columns, in the order load_data returns them
+EVIDENCE = [
+    "Administrative", "Administrative_Duration",
+    "Informational", "Informational_Duration",
+    "ProductRelated", "ProductRelated_Duration",
+    "BounceRates", "ExitRates", "PageValues", "SpecialDay",
+    "Month", "OperatingSystems", "Browser", "Region", "TrafficType",
+    "VisitorType", "Weekend",
+]
+
 
 def load_data(filename):
     """
-    Load shopping data from a CSV file `filename` and convert into a list
-    of evidence lists and a list of labels.
+    Load shopping data from a CSV file `filename` and convert into an array
+    of evidence rows and an array of labels.
 
-    Return a tuple (evidence, labels).
+    Return a tuple (evidence, labels) of NumPy arrays.
 
-    Each evidence row is a list with the following 17 values, in order:
+    evidence is a float array with one row per visit and the following 17
+    columns, in order:
         0 Administrative, int
         1 Administrative_Duration, float
         2 Informational, int
@@ -49,89 +63,87 @@ def load_data(filename):
        15 VisitorType, int (1 if Returning_Visitor, else 0)
        16 Weekend, int (1 if TRUE, else 0)
 
-    Labels are 1 if Revenue is True, otherwise 0.
+    labels is an int array, 1 where Revenue is True, otherwise 0.
     """
-    evidence = []
-    labels = []
-
     with open(filename, newline='', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            # Parse evidence fields in the required order and types
-            # Integers
-            admin = int(row["Administrative"])
-            info = int(row["Informational"])
-            product = int(row["ProductRelated"])
-            osys = int(row["OperatingSystems"])
-            browser = int(row["Browser"])
-            region = int(row["Region"])
-            traffic = int(row["TrafficType"])
-
-            # Floats
-            admin_dur = float(row["Administrative_Duration"])
-            info_dur = float(row["Informational_Duration"])
-            product_dur = float(row["ProductRelated_Duration"])
-            bounce = float(row["BounceRates"])
-            exitrate = float(row["ExitRates"])
-            pagevalue = float(row["PageValues"])
-            special = float(row["SpecialDay"])
-
-            # Month -> map to 0..11. defensive: strip and capitalize first letter(s)
-            month_str = row["Month"].strip()
-            # Some CSVs might have 'June' while mapping uses 'Jun' -> handle both
-            month_key = month_str[:3] if month_str else month_str
-            # Try several possibilities
-            month = None
-            if month_str in MONTHS:
-                month = MONTHS[month_str]
-            elif month_key in MONTHS:
-                month = MONTHS[month_key]
-            else:
-                # fallback: try capitalized full name
-                month = MONTHS.get(month_str.capitalize(), 0)
-
-            # VisitorType -> 1 if Returning_Visitor else 0
-            visitor = 1 if row["VisitorType"].strip() == "Returning_Visitor" else 0
-
-            # Weekend -> 'TRUE'/'FALSE' or 'True'/'False'
-            weekend = 1 if row["Weekend"].strip() in ("TRUE", "True", "true") else 0
-
-            # Build evidence in exact order required
-            ev = [
-                admin,
-                admin_dur,
-                info,
-                info_dur,
-                product,
-                product_dur,
-                bounce,
-                exitrate,
-                pagevalue,
-                special,
-                month,
-                osys,
-                browser,
-                region,
-                traffic,
-                visitor,
-                weekend
-            ]
-            evidence.append(ev)
-
-            # Label: Revenue -> TRUE/False strings
-            label = 1 if row["Revenue"].strip() in ("TRUE", "True", "true") else 0
-            labels.append(label)
+        header = next(csv.reader(f))
+
+    # Columns holding strings, and how to turn each of their values into an int
+    categorical = {
+        "Month": month_index,
+        "VisitorType": lambda value: 1 if value.strip() == "Returning_Visitor" else 0,
+        "Weekend": is_true,
+        "Revenue": is_true,
+    }
+    numeric = [name for name in EVIDENCE if name not in categorical]
+
+    # Let NumPy's C parser read the numeric and string columns, one pass each
+    def read_columns(names, dtype):
+        table = np.loadtxt(
+            filename, dtype=dtype, delimiter=",", skiprows=1, quotechar='"',
+            usecols=[header.index(name) for name in names], ndmin=2, encoding="utf-8"
+        )
+        return {name: table[:, i] for i, name in enumerate(names)}
+
+    column = read_columns(numeric, float)
+    strings = read_columns(list(categorical), str)
+    for name, convert in categorical.items():
+        column[name] = encode(strings[name], convert)
+
+    evidence = np.column_stack([column[name] for name in EVIDENCE])
+    labels = column["Revenue"]
 
     return (evidence, labels)
 
 
+def month_index(month_str):
+    """
+    Map a month name to 0..11, accepting 'Jun' or 'June' style names.
+    Unknown names map to 0.
+    """
+    # defensive: strip and capitalize first letter(s)
+    month_str = month_str.strip()
+    # Some CSVs might have 'June' while mapping uses 'Jun' -> handle both
+    month_key = month_str[:3] if month_str else month_str
+    # Try several possibilities
+    if month_str in MONTHS:
+        return MONTHS[month_str]
+    elif month_key in MONTHS:
+        return MONTHS[month_key]
+    else:
+        # fallback: try capitalized full name
+        return MONTHS.get(month_str.capitalize(), 0)
+
+
+def is_true(value):
+    """
+    Return 1 for 'TRUE'/'True'/'true' (ignoring whitespace), otherwise 0.
+    """
+    return 1 if value.strip() in ("TRUE", "True", "true") else 0
+
+
+def encode(column, convert):
+    """
+    Apply `convert` to an array of strings, calling it once per distinct value.
+    """
+    values, inverse = np.unique(column, return_inverse=True)
+    return np.array([convert(value) for value in values], dtype=int)[inverse.reshape(-1)]
+
+
 def train_model(evidence, labels):
     """
     Train a k-nearest neighbor classifier (k = 1) on the provided evidence and labels.
 
-    Return the fitted KNeighborsClassifier.
+    Features are standardized first, so large-valued columns such as the
+    durations don't dominate the distance. Predictions run in parallel
+    across all cores.
+
+    Return the fitted Pipeline (StandardScaler, then KNeighborsClassifier).
     """
-    model = KNeighborsClassifier(n_neighbors=1)
+    model = Pipeline([
+        ("scaler", StandardScaler()),
+        ("knn", KNeighborsClassifier(n_neighbors=1, n_jobs=-1)),
+    ])
     model.fit(evidence, labels)
     return model
 
@@ -144,14 +156,19 @@ def evaluate(labels, predictions):
     sensitivity = true positive rate = TP / P
     specificity = true negative rate = TN / N
     """
+    labels = np.asarray(labels)
+    predictions = np.asarray(predictions)
+
     # Count positives and negatives in actual labels
-    positives = sum(1 for lab in labels if lab == 1)
-    negatives = sum(1 for lab in labels if lab == 0)
+    actual_positive = labels == 1
+    actual_negative = labels == 0
+    positives = int(actual_positive.sum())
+    negatives = int(actual_negative.sum())
 
     # True positives: actual 1 and predicted 1
-    tp = sum(1 for actual, pred in zip(labels, predictions) if actual == 1 and pred == 1)
+    tp = int((actual_positive & (predictions == 1)).sum())
     # True negatives: actual 0 and predicted 0
-    tn = sum(1 for actual, pred in zip(labels, predictions) if actual == 0 and pred == 0)
+    tn = int((actual_negative & (predictions == 0)).sum())
 
     sensitivity = tp / positives if positives else 0
     specificity = tn / negatives if negatives else 0
@@ -182,7 +199,7 @@ def main():
     sensitivity, specificity = evaluate(y_test, predictions)
 
     # Report results
-    correct = sum(1 for actual, pred in zip(y_test, predictions) if actual == pred)
+    correct = int((np.asarray(y_test) == predictions).sum())
     incorrect = len(y_test) - correct
 
     print(f"Correct: {correct}")
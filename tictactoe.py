@@ -1,18 +1,29 @@
-import copy
+import functools
 import math
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# Bitboards: cell (i, j) is bit i * 3 + j, and a position is a pair of
+# 9-bit ints (x_bits, o_bits) marking the cells each player holds
+FULL = 0b111111111
+WINS = (
+    0b000000111, 0b000111000, 0b111000000,  # rows
+    0b001001001, 0b010010010, 0b100100100,  # columns
+    0b100010001, 0b001010100,               # diagonals
+)
+CELLS = tuple((1 << k, divmod(k, 3)) for k in range(9))
+
 
 def initial_state():
     """
     Returns the starting state of the board.
+    Boards are immutable tuples of rows, so result() can share unchanged rows.
     """
-    return [[EMPTY, EMPTY, EMPTY],
-            [EMPTY, EMPTY, EMPTY],
-            [EMPTY, EMPTY, EMPTY]]
+    return ((EMPTY, EMPTY, EMPTY),
+            (EMPTY, EMPTY, EMPTY),
+            (EMPTY, EMPTY, EMPTY))
 
 
 def player(board):
@@ -52,45 +63,56 @@ def result(board, action):
     if board[i][j] != EMPTY:
         raise Exception("Invalid action: cell is not empty")
 
-    new_board = copy.deepcopy(board)
-    new_board[i][j] = player(board)
-    return new_board
+    # Rebuild only the changed row. Tuple rows are shared with `board`, and
+    # tuple() returns them as is; list rows are copied so the result never
+    # aliases the caller's lists
+    rows = tuple(map(tuple, board))
+    row = rows[i]
+    new_row = row[:j] + (player(board),) + row[j + 1:]
+    return rows[:i] + (new_row,) + rows[i + 1:]
 
 
 def winner(board):
     """
     Returns the winner of the game, if there is one (X or O). Otherwise None.
     """
-    # Check rows
-    for i in range(3):
-        if board[i][0] is not None and board[i][0] == board[i][1] == board[i][2]:
-            return board[i][0]
-
-    # Check columns
-    for j in range(3):
-        if board[0][j] is not None and board[0][j] == board[1][j] == board[2][j]:
-            return board[0][j]
-
-    # Check diagonals
-    if board[0][0] is not None and board[0][0] == board[1][1] == board[2][2]:
-        return board[0][0]
-    if board[0][2] is not None and board[0][2] == board[1][1] == board[2][0]:
-        return board[0][2]
-
-    return None
+    return _winner_bits(*_bits(board))
 
 
 def terminal(board):
     """
     Returns True if game is over (win or tie), False otherwise.
     """
-    if winner(board) is not None:
-        return True
-    # If any EMPTY cell exists, not terminal
+    x_bits, o_bits = _bits(board)
+    return _winner_bits(x_bits, o_bits) is not None or (x_bits | o_bits) == FULL
+
+
+def _bits(board):
+    """
+    Returns the (x_bits, o_bits) bitboards of a board.
+    """
+    x_bits = o_bits = 0
+    bit = 1
     for row in board:
-        if EMPTY in row:
-            return False
-    return True
+        for cell in row:
+            if cell == X:
+                x_bits |= bit
+            elif cell == O:
+                o_bits |= bit
+            bit <<= 1
+    return x_bits, o_bits
+
+
+def _winner_bits(x_bits, o_bits):
+    """
+    Returns X or O if their cells complete a line, otherwise None.
+    """
+    for mask in WINS:
+        if x_bits & mask == mask:
+            return X
+        if o_bits & mask == mask:
+            return O
+    return None
 
 
 def utility(board):
@@ -117,42 +139,60 @@ def minimax(board):
     if terminal(board):
         return None
 
-    current = player(board)
+    # Positions are reached by many move orders; _value caches each one
+    _, action = _value(*_bits(board), -math.inf, math.inf)
+    return action
+
 
-    # Define helpers that return (value, action)
-    def max_value(state):
-        if terminal(state):
-            return utility(state), None
+@functools.lru_cache(maxsize=None)
+def _value(x_bits, o_bits, alpha, beta):
+    """
+    Returns (value, best action) of a bitboard position under optimal play,
+    where value is the utility the game ends with, searched with alpha-beta
+    pruning. A value <= alpha only bounds the true value from above, and one
+    >= beta from below; values strictly between them are exact. Utilities are
+    only -1, 0 or 1, so few distinct (alpha, beta) windows reach the cache.
+    """
+    w = _winner_bits(x_bits, o_bits)
+    if w == X:
+        return 1, None
+    if w == O:
+        return -1, None
+    taken = x_bits | o_bits
+    if taken == FULL:
+        return 0, None
+
+    best_action = None
+    if x_bits.bit_count() == o_bits.bit_count():
+        # X to move
         v = -math.inf
-        best_action = None
-        for action in actions(state):
-            val, _ = min_value(result(state, action))
+        for bit, action in CELLS:
+            if taken & bit:
+                continue
+            val, _ = _value(x_bits | bit, o_bits, alpha, beta)
             if val > v:
                 v = val
                 best_action = action
                 # Early win shortcut
                 if v == 1:
                     break
-        return v, best_action
-
-    def min_value(state):
-        if terminal(state):
-            return utility(state), None
+            alpha = max(alpha, v)
+            if alpha >= beta:
+                break
+    else:
+        # O to move
         v = math.inf
-        best_action = None
-        for action in actions(state):
-            val, _ = max_value(result(state, action))
+        for bit, action in CELLS:
+            if taken & bit:
+                continue
+            val, _ = _value(x_bits, o_bits | bit, alpha, beta)
             if val < v:
                 v = val
                 best_action = action
                 # Early loss shortcut
                 if v == -1:
                     break
-        return v, best_action
-
-    if current == X:
-        _, action = max_value(board)
-    else:
-        _, action = min_value(board)
-
-    return action
+            beta = min(beta, v)
+            if alpha >= beta:
+                break
+    return v, best_action